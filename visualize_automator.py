@@ -19,25 +19,42 @@ except:
     except:
         pass
 
-import os, re, sys, json, time, argparse
+import os, re, sys, json, time, argparse, threading, functools, operator, traceback, logging
+from ctypes import wintypes
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, Optional
 
-import pandas as pd
-import pyperclip
-import psutil
-import keyboard
-import mouse
 import win32api, win32con, win32gui
+import win32file, win32event, win32process, pywintypes
 
 try:
-    import pythoncom, win32com.client
-    HAVE_COM = True
-except:
-    HAVE_COM = False
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+@functools.cache
+def _calamine():
+    """python-calamine's CalamineWorkbook if installed (Rust xlsx reader), else None for openpyxl."""
+    try:
+        from python_calamine import CalamineWorkbook
+        return CalamineWorkbook
+    except ImportError:
+        return None
+
+@functools.cache
+def have_com():
+    """pywin32 COM support is only needed for PDM; probe for it on first use."""
+    try:
+        import pythoncom, win32com.client
+        return True
+    except:
+        return False
 
 OUTPUT_ROOT = r"C:\Users\Phillip.Donley\Downloads\Render Folder"
 REQUIRED_CAM_SUFFIXES = ("103", "105", "107", "109", "111")
+_DOT_TO_US = str.maketrans({".": "_"})
 VK_F = 0x46
 
 # --- Focus/Window helpers ---
@@ -48,15 +65,52 @@ def _get_fg_title():
     except Exception:
         return ""
 
+EVENT_SYSTEM_FOREGROUND = 0x0003
+WINEVENT_OUTOFCONTEXT = 0x0000
+PM_REMOVE = 0x0001
+_WinEventProc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                   wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+def _pump_messages():
+    """Dispatch pending messages on this thread (delivers out-of-context WinEvents)."""
+    u32 = ctypes.windll.user32; msg = wintypes.MSG()
+    while u32.PeekMessageW(ctypes.byref(msg), None, 0, 0, PM_REMOVE):
+        u32.TranslateMessage(ctypes.byref(msg))
+        u32.DispatchMessageW(ctypes.byref(msg))
+
 def _wait_for_dialog_title(substrs=("Open",), timeout=20.0, poll=0.25):
-    """Wait until the foreground window title contains any of substrs."""
+    """
+    Wait until the foreground window title contains any of substrs.
+    Subscribes to EVENT_SYSTEM_FOREGROUND and blocks in MsgWaitForMultipleObjects
+    until the hook's message arrives; poll only caps each wait as a safety net.
+    """
+    subs = [s.lower() for s in substrs]
+    def hit(t): return any(s in t.lower() for s in subs)
+    ev = threading.Event()
+    def cb(hook, event, hwnd, obj, child, tid, ms):
+        try:
+            if hwnd and hit(win32gui.GetWindowText(hwnd) or ""): ev.set()
+        except Exception:
+            pass
+    proc = _WinEventProc(cb)  # keep a reference until unhooked
+    u32 = ctypes.windll.user32
+    # Hook first, then look: a switch between the two can't be missed
+    hook = u32.SetWinEventHook(EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND,
+                               None, proc, 0, 0, WINEVENT_OUTOFCONTEXT)
     end = time.time() + timeout
-    while time.time() < end:
-        t = _get_fg_title()
-        if any(s.lower() in t.lower() for s in substrs):
-            return True
-        time.sleep(poll)
-    return False
+    try:
+        while True:
+            if hook: _pump_messages()
+            # Re-read the title on every wake too: it can change without a foreground switch
+            if ev.is_set() or hit(_get_fg_title()): return True
+            left = end - time.time()
+            if left <= 0: return False
+            if hook:
+                win32event.MsgWaitForMultipleObjects([], False, int(min(poll, left) * 1000), win32event.QS_ALLINPUT)
+            else:
+                time.sleep(min(poll, left))  # no hook available; plain polling
+    finally:
+        if hook: u32.UnhookWinEvent(hook)
 
 # Updated with new output folder steps
 GUIDED_STEPS = [
@@ -78,57 +132,275 @@ GUIDED_STEPS = [
     "project_no_save_btn"      # 16. No button when closing project
 ]
 UI_POINTS_PATH = "ui_points.json"
+IMPORT_GRACE = 30  # s to wait for a late Import Settings after the file title appears
+
+_LEVELS = {logging.DEBUG: "DBG", logging.INFO: "INFO", logging.WARNING: "WARN", logging.ERROR: "ERROR"}
+
+class _Fmt(logging.Formatter):
+    """[HH:MM:SS] LEVEL message, with the timestamp formatted at most once a second."""
+    _ts = [0, ""]  # (epoch second, formatted)
+    def format(self, r):
+        now = int(r.created)
+        if now != self._ts[0]:
+            self._ts[:] = [now, time.strftime("%H:%M:%S", time.localtime(now))]
+        return f"[{self._ts[1]}] {_LEVELS.get(r.levelno, r.levelname):<5s} {r.getMessage()}"
+
+class _Out(logging.StreamHandler):
+    """stdout handler that flushes every record in verbose mode, otherwise only WARN/ERROR,
+    so a redirected unattended run still has its tail if it crashes or is killed."""
+    def __init__(self, v):
+        super().__init__(sys.stdout); self.v = v
+    def emit(self, r):
+        try:
+            self.stream.write(self.format(r) + self.terminator)
+            if self.v or r.levelno >= logging.WARNING: self.stream.flush()
+        except Exception:
+            self.handleError(r)
 
 class Logger:
-    def __init__(self, v=False): self.v = v
-    def _p(self, l, m): print(f"[{time.strftime('%H:%M:%S')}] {l:<5s} {m}"); sys.stdout.flush()
-    def info(self, m): self._p("INFO", m)
-    def warn(self, m): self._p("WARN", m)
-    def error(self, m): self._p("ERROR", m)
+    """Thin facade over the "viz" logger so call sites keep info/warn/error/dbg."""
+    def __init__(self, v=False):
+        self.v = v
+        self.lg = logging.getLogger("viz"); self.lg.propagate = False
+        self.lg.setLevel(logging.DEBUG if v else logging.INFO)
+        h = _Out(v); h.setFormatter(_Fmt())
+        self.lg.handlers[:] = [h]  # main() re-creates the logger once --verbose is known
+    def info(self, m): self.lg.info(m)
+    def warn(self, m): self.lg.warning(m)
+    def error(self, m): self.lg.error(m)
     def dbg(self, m):
-        if self.v: self._p("DBG", m)
+        if self.v: self.lg.debug(m)
 
 log = Logger(False)
 
+# --- Raw SendInput ---
+INPUT_MOUSE, INPUT_KEYBOARD = 0, 1
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", wintypes.LONG), ("dy", wintypes.LONG), ("mouseData", wintypes.DWORD),
+                ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD), ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD), ("dwExtraInfo", ctypes.c_size_t)]
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [("uMsg", wintypes.DWORD), ("wParamL", wintypes.WORD), ("wParamH", wintypes.WORD)]
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+class INPUT(ctypes.Structure):
+    _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+# Keys whose scan code needs the E0 prefix (the grey block / arrows, not the numpad)
+_EXTENDED = {win32con.VK_DELETE, win32con.VK_INSERT, win32con.VK_HOME, win32con.VK_END,
+             win32con.VK_PRIOR, win32con.VK_NEXT, win32con.VK_LEFT, win32con.VK_RIGHT,
+             win32con.VK_UP, win32con.VK_DOWN}
+
+def _key(vk, up=False):
+    """KEYBDINPUT carrying both the VK and its scan code, so apps reading either see a real key."""
+    i = INPUT(type=INPUT_KEYBOARD)
+    fl = (win32con.KEYEVENTF_KEYUP if up else 0) | (win32con.KEYEVENTF_EXTENDEDKEY if vk in _EXTENDED else 0)
+    i.u.ki = KEYBDINPUT(wVk=vk, wScan=ctypes.windll.user32.MapVirtualKeyW(vk, 0), dwFlags=fl)
+    return i
+
+def _send_inputs(evs):
+    arr = (INPUT * len(evs))(*evs)
+    return ctypes.windll.user32.SendInput(len(evs), arr, ctypes.sizeof(INPUT))
+
+def _combo(*vks):
+    """INPUT array pressing vks in order and releasing them in reverse."""
+    evs = [_key(v) for v in vks] + [_key(v, True) for v in reversed(vks)]
+    return (INPUT * len(evs))(*evs)
+
+VK_CTRL, VK_ALT = win32con.VK_CONTROL, win32con.VK_MENU
+
+# Every key sequence the driver sends, built once at import
+KEYS = {
+    "ctrl+a": _combo(VK_CTRL, ord("A")),
+    "ctrl+o": _combo(VK_CTRL, ord("O")),
+    "ctrl+r": _combo(VK_CTRL, ord("R")),
+    "ctrl+v": _combo(VK_CTRL, ord("V")),
+    "ctrl+w": _combo(VK_CTRL, ord("W")),
+    "alt+d": _combo(VK_ALT, ord("D")),
+    "alt+f": _combo(VK_ALT, ord("F")),
+    "enter": _combo(win32con.VK_RETURN),
+    "escape": _combo(win32con.VK_ESCAPE),
+    "delete": _combo(win32con.VK_DELETE),
+    "n": _combo(ord("N")),
+}
+
+def press(name):
+    """Send a precompiled KEYS sequence as one atomic SendInput call."""
+    arr = KEYS[name]
+    return ctypes.windll.user32.SendInput(len(arr), arr, ctypes.sizeof(INPUT))
+
+MOUSEEVENTF_VIRTUALDESK = 0x4000
+
+def _mouse(flags, dx=0, dy=0):
+    i = INPUT(type=INPUT_MOUSE)
+    i.u.mi = MOUSEINPUT(dx=dx, dy=dy, dwFlags=flags)
+    return i
+
+def _abs_move(x, y):
+    """Absolute move to screen pixel (x, y), normalised to 0..65535 across the virtual desktop."""
+    vx, vy = win32api.GetSystemMetrics(win32con.SM_XVIRTUALSCREEN), win32api.GetSystemMetrics(win32con.SM_YVIRTUALSCREEN)
+    vw, vh = win32api.GetSystemMetrics(win32con.SM_CXVIRTUALSCREEN), win32api.GetSystemMetrics(win32con.SM_CYVIRTUALSCREEN)
+    return _mouse(win32con.MOUSEEVENTF_MOVE | win32con.MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK,
+                  ((x - vx) * 65535) // max(vw - 1, 1), ((y - vy) * 65535) // max(vh - 1, 1))
+
+def _hw_click(x, y, n=1):
+    """Move to (x, y) and send n left clicks as one SendInput batch, well inside the double-click time."""
+    down, up = _mouse(win32con.MOUSEEVENTF_LEFTDOWN), _mouse(win32con.MOUSEEVENTF_LEFTUP)
+    _send_inputs([_abs_move(x, y)] + [down, up] * n)
+
 def send_hw_key(vk, ds=0.03, us=0.03):
-    win32api.keybd_event(vk, 0, 0, 0); time.sleep(ds)
-    win32api.keybd_event(vk, 0, win32con.KEYEVENTF_KEYUP, 0); time.sleep(us)
+    """Single key with a dwell between down and up, like a physical press."""
+    _send_inputs([_key(vk)]); time.sleep(ds)
+    _send_inputs([_key(vk, True)]); time.sleep(us)
 
+def _set_clip(s, tries=5):
+    """Put s on the clipboard in one Open/Empty/Set/Close transaction."""
+    import win32clipboard  # only the paste fallbacks need it
+    for i in range(tries):
+        try:
+            win32clipboard.OpenClipboard()
+        except pywintypes.error:
+            time.sleep(0.1)  # another process holds the clipboard
+            continue
+        try:
+            win32clipboard.EmptyClipboard()
+            win32clipboard.SetClipboardData(win32clipboard.CF_UNICODETEXT, s)
+            return
+        finally:
+            win32clipboard.CloseClipboard()
+    raise RuntimeError("Clipboard busy")
+
+@functools.lru_cache(maxsize=4096)
 def sanitize_job_name(tms, part):
     tms = str(tms).strip()
-    if re.fullmatch(r"\d+\.0", tms): tms = tms[:-2]
-    part = str(part).strip().replace(".", "_")
-    return (f"{tms}_{part}").replace(".", "_")
+    if tms.endswith(".0") and tms[:-2].isdigit(): tms = tms[:-2]  # Excel float, e.g. "12345.0"
+    return f"{tms}_{str(part).strip()}".translate(_DOT_TO_US)
 
-def is_visualize_running():
-    for p in psutil.process_iter(attrs=["name"]):
-        try:
-            if p.info["name"] and "Visualize" in p.info["name"]: return True
-        except: pass
-    return False
+def _is_visualize_title(t):
+    return bool(t) and "Visualize" in t and "Open" not in t and "Import" not in t
 
-def get_visualize_hwnd():
+_hwnd_cache = [None]  # last Visualize main window; validated before reuse
+_vis_class = [None]  # its window class, learned on the first match and used as a prefilter
+
+def _find_visualize(cls=None):
     def cb(hwnd, res):
-        if win32gui.IsWindowVisible(hwnd):
-            t = win32gui.GetWindowText(hwnd)
-            if t and "Visualize" in t and "Open" not in t and "Import" not in t:
-                res.append((hwnd, t))
+        if not win32gui.IsWindowVisible(hwnd): return
+        if cls and win32gui.GetClassName(hwnd) != cls: return  # skip the title fetch for other apps
+        t = win32gui.GetWindowText(hwnd)
+        if _is_visualize_title(t):
+            res.append((hwnd, t))
     r = []
     win32gui.EnumWindows(cb, r)
-    return r[0] if r else (None, None)
+    return r
+
+def get_visualize_hwnd():
+    h = _hwnd_cache[0]
+    if h and win32gui.IsWindow(h) and win32gui.IsWindowVisible(h):
+        t = win32gui.GetWindowText(h)
+        if _is_visualize_title(t): return h, t
+    _hwnd_cache[0] = None
+    r = _find_visualize(_vis_class[0]) or (_vis_class[0] and _find_visualize())
+    if not r: return (None, None)
+    _hwnd_cache[0] = r[0][0]
+    _vis_class[0] = win32gui.GetClassName(r[0][0])
+    return r[0]
+
+def wait_for_window(predicate, timeout=20.0, poll=0.05):
+    """Return the first visible top-level hwnd satisfying predicate(hwnd), or None on timeout."""
+    end = time.time() + timeout
+    while True:
+        r = []
+        def cb(h, res):
+            if win32gui.IsWindowVisible(h) and predicate(h): res.append(h)
+        win32gui.EnumWindows(cb, r)
+        if r: return r[0]
+        if time.time() >= end: return None
+        time.sleep(poll)
+
+def _find_child(parent, cls, labels=None):
+    """First visible child of class cls (caption, ignoring '&', in labels if given)."""
+    hits = []
+    def cb(h, res):
+        if win32gui.GetClassName(h) == cls and win32gui.IsWindowVisible(h) \
+                and (labels is None or win32gui.GetWindowText(h).replace("&", "") in labels):
+            res.append(h)
+    try: win32gui.EnumChildWindows(parent, cb, hits)
+    except pywintypes.error: pass
+    return hits[0] if hits else None
+
+def _click_dialog_button(dlg, labels):
+    """Post BM_CLICK to a native child Button whose caption is in labels."""
+    b = _find_child(dlg, "Button", labels)
+    if not b: return False
+    win32gui.PostMessage(b, win32con.BM_CLICK, 0, 0)
+    return True
+
+def wait_dialog_ready(dlg, timeout=2.0, poll=0.05):
+    """Wait until a common dialog's filename box (cmb13) exists, is visible and takes input."""
+    end = time.time() + timeout
+    while True:
+        try:
+            box = win32gui.GetDlgItem(dlg, 0x47C)
+            if win32gui.IsWindowVisible(box) and win32gui.IsWindowEnabled(box): return True
+        except pywintypes.error:
+            pass
+        if time.time() >= end: return False
+        time.sleep(poll)
+
+def set_dialog_path(dlg, path):
+    """Write path straight into a common file dialog's filename box and press its default button."""
+    # Only the filename box itself: any other Edit (search, address bar) would swallow the path
+    try: box = win32gui.GetDlgItem(dlg, 0x47C)  # cmb13, the filename combo
+    except pywintypes.error: return False
+    edit = box if win32gui.GetClassName(box) == "Edit" else _find_child(box, "Edit")
+    if not edit or not win32gui.SendMessage(edit, win32con.WM_SETTEXT, 0, path): return False
+    u32 = ctypes.windll.user32
+    buf = ctypes.create_unicode_buffer(u32.SendMessageW(edit, win32con.WM_GETTEXTLENGTH, 0, 0) + 1)
+    u32.SendMessageW(edit, win32con.WM_GETTEXT, len(buf), buf)
+    if buf.value != path: return False  # didn't take; let the paste fallback run
+    try: ok = win32gui.GetDlgItem(dlg, win32con.IDOK)
+    except pywintypes.error: ok = None
+    if ok: win32gui.PostMessage(ok, win32con.BM_CLICK, 0, 0)
+    else: press("enter")
+    return True
+
+def wait_for_window_gone(hwnd, timeout=10.0, poll=0.05):
+    """Wait until hwnd is destroyed or hidden."""
+    end = time.time() + timeout
+    while win32gui.IsWindow(hwnd) and win32gui.IsWindowVisible(hwnd):
+        if time.time() >= end: return False
+        time.sleep(poll)
+    return True
+
+_running_cache = [0.0, False]  # (monotonic time, result)
+
+def is_visualize_running(ttl=30.0):
+    """True if a Visualize main window exists; cached for ttl seconds."""
+    now = time.monotonic()
+    if now - _running_cache[0] > ttl or not _running_cache[1]:
+        _running_cache[:] = [now, get_visualize_hwnd()[0] is not None]
+    return _running_cache[1]
 
 def focus_visualize():
     log.info("[FOCUS] Clicking Visualize...")
     v = get_visualize_hwnd()
     if v and len(v) == 2 and v[0]:
         h, t = v
+        if win32gui.GetForegroundWindow() == h:
+            log.info("[FOCUS] ✓ already foreground")
+            return True
         try:
             rect = win32gui.GetWindowRect(h)
             x = (rect[0] + rect[2]) // 2
             y = (rect[1] + rect[3]) // 2
-            mouse.move(x, y, absolute=True, duration=0.1)
-            time.sleep(0.2)
-            mouse.click()
+            _hw_click(x, y)
             time.sleep(0.5)
             win32gui.ShowWindow(h, win32con.SW_RESTORE)
             win32gui.SetForegroundWindow(h)
@@ -136,20 +408,56 @@ def focus_visualize():
             log.info("[FOCUS] ✓")
             return True
         except Exception as e:
+            _hwnd_cache[0] = None  # stale/closed window; look it up again next time
             log.warn(f"[FOCUS] {e}")
     return False
 
+_POINTS_CACHE = {}  # abspath -> (mtime_ns, points, xy) so repeat loads skip the parse
+
+def _unpack_points(points):
+    return {l: (d["x"], d["y"]) for l, d in points.items()}
+
 class UIPointsIO:
     def __init__(self, p=UI_POINTS_PATH):
         self.path = p; self.points = {}
+        self._xy = {}  # label -> (x, y), kept alongside points so get() is one dict hit
+        self._loaded = False
+        self._dirty = False  # set_point changed something since the last load/save
     def load(self):
-        if os.path.exists(self.path):
-            self.points = json.load(open(self.path))
-            log.info(f"[UI] Loaded {len(self.points)} points")
-    def save(self): json.dump(self.points, open(self.path, "w"), indent=2)
-    def set_point(self, l, x, y): self.points[l] = {"x": x, "y": y}
+        """Idempotent: the first successful call populates points, later calls are no-ops."""
+        if self._loaded: return
+        try: mt = os.stat(self.path).st_mtime_ns
+        except OSError: return
+        self._loaded = True
+        key = os.path.abspath(self.path)
+        hit = _POINTS_CACHE.get(key)
+        if hit and hit[0] == mt:
+            _, self.points, self._xy = hit
+            return
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        self.points = orjson.loads(raw) if HAVE_ORJSON else json.loads(raw)
+        self._xy = _unpack_points(self.points)
+        _POINTS_CACHE[key] = (mt, self.points, self._xy)
+        log.info(f"[UI] Loaded {len(self.points)} points")
+    def save(self):
+        if not self._dirty and os.path.exists(self.path): return  # file already matches
+        if HAVE_ORJSON:
+            data = orjson.dumps(self.points, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(self.points, indent=2).encode()
+        with open(self.path, "wb") as f:
+            f.write(data)
+        _POINTS_CACHE[os.path.abspath(self.path)] = (os.stat(self.path).st_mtime_ns, self.points, self._xy)
+        self._dirty = False
+    def set_point(self, l, x, y):
+        if self._xy.get(l) == (x, y): return
+        self.points[l] = {"x": x, "y": y}; self._xy[l] = (x, y); self._dirty = True
     def has(self, l): return l in self.points
-    def get(self, l): d = self.points[l]; return d["x"], d["y"]
+    def get(self, l): return self._xy[l]
+
+MOD_CONTROL, MOD_SHIFT, MOD_NOREPEAT = 0x0002, 0x0004, 0x4000
+WM_HOTKEY = 0x0312
 
 class GuidedRecorder:
     """
@@ -162,22 +470,44 @@ class GuidedRecorder:
     def __init__(self, io):
         self.io = io
         self.io.load()
-        self.idx = 0
-        # Find first uncaptured step
-        for i, l in enumerate(GUIDED_STEPS):
-            if not self.io.has(l):
-                self.idx = i
-                break
-        else:
-            self.idx = len(GUIDED_STEPS)  # All captured
-        self.running = True
+        self._step_index = {s: i for i, s in enumerate(GUIDED_STEPS)}
+        self._uncaptured = {s for s in GUIDED_STEPS if not self.io.has(s)}
+        # Start at the first uncaptured step (past the end if all are captured)
+        self.idx = min((self._step_index[s] for s in self._uncaptured), default=len(GUIDED_STEPS))
+        self._done = threading.Event()  # set by fin()
         self._bind()
     
     def _bind(self):
-        keyboard.add_hotkey("ctrl+shift+space", self.cap)
-        keyboard.add_hotkey("ctrl+shift+right", self.skip_forward)
-        keyboard.add_hotkey("ctrl+shift+left", self.skip_back)
-        keyboard.add_hotkey("ctrl+shift+q", self.fin)
+        # id -> (vk, handler); all bound with Ctrl+Shift
+        self._hotkeys = {
+            1: (win32con.VK_SPACE, self.cap),
+            2: (win32con.VK_RIGHT, self.skip_forward),
+            3: (win32con.VK_LEFT, self.skip_back),
+            4: (ord("Q"), self.fin),
+        }
+        ready = threading.Event()
+        threading.Thread(target=self._hotkey_loop, args=(ready,), daemon=True).start()
+        ready.wait()
+    
+    def _hotkey_loop(self, ready):
+        """RegisterHotKey is per-thread, so register and pump WM_HOTKEY on the same thread."""
+        u32 = ctypes.windll.user32
+        self._hk_tid = win32api.GetCurrentThreadId()
+        for i, (vk, _) in self._hotkeys.items():
+            if not u32.RegisterHotKey(None, i, MOD_CONTROL | MOD_SHIFT | MOD_NOREPEAT, vk):
+                log.warn(f"Hotkey {i} is already registered by another app")
+        ready.set()
+        msg = wintypes.MSG()
+        try:
+            while u32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == WM_HOTKEY and msg.wParam in self._hotkeys:
+                    try:
+                        self._hotkeys[msg.wParam][1]()
+                    except Exception as e:  # keep the hotkeys alive; e.g. a failed save can be retried
+                        log.error(f"Hotkey handler failed: {e}")
+                        log.error(traceback.format_exc().rstrip())
+        finally:
+            for i in self._hotkeys: u32.UnregisterHotKey(None, i)
     
     def cap(self):
         """Capture current point and advance"""
@@ -185,16 +515,19 @@ class GuidedRecorder:
             log.warn("All steps captured!")
             return
         l = GUIDED_STEPS[self.idx]
-        x, y = mouse.get_position()
+        x, y = win32api.GetCursorPos()
         self.io.set_point(l, x, y)
+        self._uncaptured.discard(l)
         log.info(f"✓ [{self.idx+1}/{len(GUIDED_STEPS)}] {l} at ({x},{y})")
         self.idx += 1
+        self._print_step()
     
     def skip_forward(self):
         """Skip to next step without capturing"""
         if self.idx < len(GUIDED_STEPS) - 1:
             self.idx += 1
             log.info(f"→ Skipped to step {self.idx+1}")
+            self._print_step()
         else:
             log.warn("Already at last step")
     
@@ -203,14 +536,24 @@ class GuidedRecorder:
         if self.idx > 0:
             self.idx -= 1
             log.info(f"← Back to step {self.idx+1}")
+            self._print_step()
         else:
             log.warn("Already at first step")
     
     def fin(self):
         """Save and quit"""
         self.io.save()
-        self.running = False
         log.info("✓ Saved and exiting!")
+        if self._uncaptured: log.warn(f"{len(self._uncaptured)} step(s) still not captured")
+        self._done.set()
+        ctypes.windll.user32.PostThreadMessageW(self._hk_tid, win32con.WM_QUIT, 0, 0)
+    
+    def _print_step(self):
+        if self.idx < len(GUIDED_STEPS):
+            l = GUIDED_STEPS[self.idx]
+            log.info(f">>> STEP {self.idx+1}/{len(GUIDED_STEPS)}: {l}")
+        else:
+            log.info(">>> ALL STEPS CAPTURED! Press Ctrl+Shift+Q to save and quit.")
     
     def run(self):
         log.info("="*80)
@@ -225,27 +568,55 @@ class GuidedRecorder:
         log.info("")
         log.info("STEPS TO CAPTURE:")
         for i, s in enumerate(GUIDED_STEPS, 1):
-            status = "✓" if self.io.has(s) else " "
+            status = " " if s in self._uncaptured else "✓"
             log.info(f"  [{status}] {i:2d}. {s}")
         log.info("")
         log.info("="*80)
         
-        while self.running:
-            if self.idx < len(GUIDED_STEPS):
-                l = GUIDED_STEPS[self.idx]
-                log.info(f">>> STEP {self.idx+1}/{len(GUIDED_STEPS)}: {l}")
-            else:
-                log.info(">>> ALL STEPS CAPTURED! Press Ctrl+Shift+Q to save and quit.")
-            time.sleep(3)
+        # Handlers print the next step themselves; just idle until Ctrl+Shift+Q
+        self._print_step()
+        while not self._done.wait(0.5): pass  # timed so Ctrl+C still gets through
+
+def _prefetch_file(p, chunk=1 << 20):
+    """Read p end to end with a sequential-scan hint so it sits in the page cache."""
+    try:
+        h = win32file.CreateFile(
+            p, win32file.GENERIC_READ,
+            win32file.FILE_SHARE_READ | win32file.FILE_SHARE_WRITE | win32file.FILE_SHARE_DELETE,
+            None, win32file.OPEN_EXISTING, win32file.FILE_FLAG_SEQUENTIAL_SCAN, None)
+    except pywintypes.error as e:
+        log.dbg(f"[PDM] Prefetch skipped: {e}")
+        return
+    try:
+        while win32file.ReadFile(h, chunk)[1]: pass
+        log.dbg(f"[PDM] Cache warmed: {p}")
+    except pywintypes.error:
+        pass
+    finally:
+        h.Close()
+
+_com_tls = threading.local()  # per-thread CoInitialize marker
 
 class PDMClient:
     def __init__(self, vn):
-        if not HAVE_COM: raise RuntimeError("No COM")
+        if not have_com(): raise RuntimeError("No COM")
         self.vn = vn; self.v = None
         self._session_count = 0  # Track open operations
+        self._folder_cache = {}  # dirname -> (IEdmFolder, folder ID), cleared on session refresh
+        self._file_cache = {}  # (dirname, basename) -> IEdmFile, same lifetime
+        # All COM runs on this one thread: the vault lives in its apartment, and lookups for
+        # the next row can run there while Visualize is busy with the current one
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdm")
+        self._pending = {}  # path -> Future from prefetch()
     
     def login(self):
-        pythoncom.CoInitialize()
+        self._pool.submit(self._login).result()
+    
+    def _login(self):
+        import pythoncom, win32com.client
+        if not getattr(_com_tls, "init", False):  # once per thread; re-logins reuse the apartment
+            pythoncom.CoInitialize()
+            _com_tls.init = True
         self.v = win32com.client.Dispatch("ConisioLib.EdmVault")
         self.v.LoginAuto(self.vn, 0)
     
@@ -257,19 +628,35 @@ class PDMClient:
         self._session_count += 1
         if self._session_count % 50 == 0:  # Every 50 opens, refresh
             log.info("[PDM] Refreshing session...")
+            self._folder_cache.clear(); self._file_cache.clear()
             try:
                 # Test if session is alive
                 self.v.RootFolderPath
             except:
                 # Session is dead, re-login
                 log.warn("[PDM] Session stale, re-logging in...")
-                self.login()
+                self._login()  # already on the COM thread
+    
+    def prefetch(self, p):
+        """Start preflight_local(p) on the COM thread; a later preflight_local(p) collects the result."""
+        # Rows that were skipped or failed never collect theirs; drop finished leftovers
+        for k in [k for k, f in self._pending.items() if k != p and f.done()]: del self._pending[k]
+        if p not in self._pending: self._pending[p] = self._pool.submit(self._preflight, p)
+        return self._pending[p]
+    
+    def close(self):
+        self._pending.clear()
+        self._pool.shutdown(wait=True)
     
     def preflight_local(self, p):
         """
         Pre-fetch and warm cache for a file before Visualize opens it.
         This prevents Visualize's slow internal PDM search.
         """
+        f = self._pending.pop(p, None) or self._pool.submit(self._preflight, p)
+        return f.result()
+    
+    def _preflight(self, p):
         if not self.v or not os.path.isabs(p):
             return p
         
@@ -280,30 +667,39 @@ class PDMClient:
             # Get folder and file
             dn = os.path.dirname(p)
             bn = os.path.basename(p)
-            fo = self.v.GetFolderFromPath(dn)
-            if not fo:
-                log.dbg(f"[PDM] Folder not in vault: {dn}")
-                return p
+            hit = self._folder_cache.get(dn)
+            if not hit:
+                fo = self.v.GetFolderFromPath(dn)
+                if not fo:
+                    log.dbg(f"[PDM] Folder not in vault: {dn}")
+                    return p
+                hit = self._folder_cache[dn] = (fo, fo.ID)  # ID is a COM property; read it once
+            fo, fid = hit
             
-            fi = fo.GetFile(bn)
+            fi = self._file_cache.get((dn, bn)) or fo.GetFile(bn)
             if not fi:
                 log.dbg(f"[PDM] File not in vault: {bn}")
                 return p
+            self._file_cache[(dn, bn)] = fi
             
-            # Get latest version
-            log.info(f"[PDM] Pre-fetching: {bn}")
-            fi.GetFileCopy(0)
+            # Get latest version, unless the local copy already is it
+            try: current = fi.GetLocalVersionNo(fid) == fi.CurrentVersion
+            except Exception: current = False
+            if current:
+                log.dbg(f"[PDM] Local copy current: {bn}")
+            else:
+                log.info(f"[PDM] Pre-fetching: {bn}")
+                fi.GetFileCopy(0)
             
             # Get local cache path
-            lp = fi.GetLocalPath(fo.ID)
-            if lp and os.path.exists(lp):
-                # Warm OS cache by reading first few bytes
+            lp = fi.GetLocalPath(fid)
+            if lp:
                 try:
-                    with open(lp, 'rb') as f:
-                        f.read(4096)
-                    log.dbg(f"[PDM] Cache warmed: {lp}")
-                except:
-                    pass
+                    os.stat(lp)
+                except OSError:
+                    return p
+                # Warm the whole file in the background while Visualize brings up its dialogs
+                threading.Thread(target=_prefetch_file, args=(lp,), daemon=True).start()
                 return lp
             
             return p
@@ -316,84 +712,225 @@ class PDMClient:
         """Legacy method - now just calls preflight_local"""
         return self.preflight_local(p)
 
+FILE_LIST_DIRECTORY = 0x0001
+
+class _DirWatch:
+    """
+    Overlapped ReadDirectoryChangesW on one folder.
+    wait() sleeps in the kernel until the folder changes instead of re-listing it.
+    """
+    def __init__(self, path, flt=win32file.FILE_NOTIFY_CHANGE_FILE_NAME | win32file.FILE_NOTIFY_CHANGE_SIZE):
+        self.flt = flt
+        self.h = win32file.CreateFile(
+            path, FILE_LIST_DIRECTORY,
+            win32file.FILE_SHARE_READ | win32file.FILE_SHARE_WRITE | win32file.FILE_SHARE_DELETE,
+            None, win32file.OPEN_EXISTING,
+            win32file.FILE_FLAG_BACKUP_SEMANTICS | win32file.FILE_FLAG_OVERLAPPED, None)
+        self.ov = pywintypes.OVERLAPPED()
+        self.ov.hEvent = win32event.CreateEvent(None, True, False, None)
+        self.buf = win32file.AllocateReadBuffer(4096)
+        self._arm()
+    
+    def _arm(self):
+        win32file.ReadDirectoryChangesW(self.h, self.buf, False, self.flt, self.ov)
+    
+    def wait(self, to):
+        """List of (action, name); [] on timeout, None if notifications overflowed (rescan)."""
+        if win32event.WaitForSingleObject(self.ov.hEvent, max(0, int(to * 1000))) != win32event.WAIT_OBJECT_0:
+            return []
+        n = win32file.GetOverlappedResult(self.h, self.ov, True)
+        ch = win32file.FILE_NOTIFY_INFORMATION(self.buf, n) if n else None
+        win32event.ResetEvent(self.ov.hEvent)
+        self._arm()
+        return ch
+    
+    def close(self):
+        try:
+            win32file.CancelIo(self.h)
+            win32file.GetOverlappedResult(self.h, self.ov, True)  # let the kernel finish with buf/ov
+        except Exception: pass  # ERROR_OPERATION_ABORTED is the normal outcome
+        self.h.Close()
+        self.ov.hEvent.Close()
+
 class RenderWatcher:
-    def __init__(self, root, settle=20):
+    RESCAN = 30  # fallback full listing interval when change notifications are active
+    SETTLE_RETRIES = 5  # failed stability checks that may extend the deadline
+    BACKOFF = (0.5, 5.0)  # polling interval grows from/to these bounds while nothing changes
+    
+    def __init__(self, root, settle=20, suffixes=REQUIRED_CAM_SUFFIXES):
         self.root = root
         self.settle = settle
+        self.suffixes = tuple(suffixes)
+        # One automaton for every suffix: a single C-level pass per filename however many there are
+        # Digit-bounded so a suffix buried in a longer number (part 19111234) never counts
+        self._cam_re = re.compile(r"(?<!\d)(?:%s)(?!\d)" % "|".join(map(re.escape, sorted(self.suffixes, key=len, reverse=True))))
         self._found_cache = {}  # Reset tracking
+        self._root_ok = False
+        self._scan_mt = None; self._scan_n = 0  # folder mtime/entry count at the last full listing
     
-    def _cand(self, jn):
-        if not os.path.isdir(self.root): return []
-        ex = os.path.join(self.root, jn); p = []
-        if os.path.isdir(ex): p.append(ex)
+    def _cand(self, jl, ex):
+        """Job folders under root: the exact path ex if present, else names containing jl."""
+        if not self._root_ok:
+            if not os.path.isdir(self.root): return []
+            self._root_ok = True  # output root doesn't go away mid-run
+        if os.path.isdir(ex): return [ex]  # nothing beats the exact name; skip the listing
+        p = []
         for d in os.listdir(self.root):
             f = os.path.join(self.root, d)
-            if os.path.isdir(f) and jn.lower() in d.lower() and f not in p: p.append(f)
+            if jl in d.lower() and os.path.isdir(f): p.append(f)
         return p
     
     def wait_dir(self, jn, to=300):
         log.info(f"[WATCH] Waiting for {jn}...")
         e = time.time() + to
-        while time.time() < e:
-            c = self._cand(jn)
-            if c: log.info(f"[WATCH] ✓ {c[0]}"); return c[0]
-            time.sleep(2)
+        delay = self.BACKOFF[0]
+        jl, ex = jn.lower(), os.path.join(self.root, jn)  # fixed for the whole wait
+        # Armed before the first look, so a folder created in between still wakes us
+        try: dw = _DirWatch(self.root, win32file.FILE_NOTIFY_CHANGE_DIR_NAME) if os.path.isdir(self.root) else None
+        except Exception: dw = None
+        try:
+            while time.time() < e:
+                c = self._cand(jl, ex)
+                if c: log.info(f"[WATCH] ✓ {c[0]}"); return c[0]
+                left = max(0, e - time.time())
+                if dw:
+                    dw.wait(min(left, self.RESCAN))  # a folder added/renamed under the root
+                    continue
+                time.sleep(min(delay, left))
+                delay = min(delay * 1.5, self.BACKOFF[1])
+        finally:
+            if dw: dw.close()
         log.error("[WATCH] ✗ Timeout"); return None
     
-    def wait_five(self, jd)->bool:
+    def _match(self, jd, f, found):
+        if not f.lower().endswith((".jpg", ".jpeg")): return None
+        ms = self._cam_re.findall(f)
+        if not ms: return None
+        s = ms[-1]  # the camera suffix comes last; TMS/part numbers earlier can contain 103..111
+        found[s] = os.path.join(jd, f)
+        if s not in self._found_cache:
+            log.info(f"[WATCH] Found {s}: {f}")
+            self._found_cache[s] = f
+        return s
+    
+    def _scan(self, jd, found):
+        # A directory's mtime moves whenever an entry is added, removed or renamed
+        mt = os.stat(jd).st_mtime_ns
+        if mt == self._scan_mt: return self._scan_n
+        found.clear()
+        with os.scandir(jd) as it:
+            names = [e.name for e in it]
+        for f in names: self._match(jd, f, found)
+        self._scan_mt, self._scan_n = mt, len(names)
+        return len(names)
+    
+    def _sizes(self, found):
+        """name -> size for the found renders. os.stat opens each file, so the size is the real one;
+        the directory-entry size scandir reports lags while Visualize still has the JPG open."""
+        r = {}
+        for p in found.values():
+            try: r[os.path.basename(p)] = os.stat(p).st_size
+            except OSError: pass  # reported as "disappeared?" below
+        return r
+    
+    def _stable(self, jd, found, dw=None, until=None):
+        names = {s: os.path.basename(p) for s, p in found.items()}
+        snap = self._sizes(found)
+        log.info(f"[WATCH] Waiting {self.settle}s for stability...")
+        if dw:
+            # Quiet window: a write to any of the renders restarts it, so growth is
+            # seen the moment it happens instead of after a blind settle sleep
+            want = set(names.values())
+            quiet = time.time() + self.settle
+            while (left := quiet - time.time()) > 0:
+                ch = dw.wait(left)
+                if ch and any(f in want for _, f in ch):
+                    if until and time.time() + self.settle > until: return False
+                    log.dbg("[WATCH] Render still being written; restarting settle window")
+                    quiet = time.time() + self.settle
+                    snap = self._sizes(found)
+        else:
+            time.sleep(self.settle)
+        cur = self._sizes(found)
+        
+        ok = True
+        for s, n in names.items():
+            if n not in snap or n not in cur:
+                log.warn(f"[WATCH] {s} disappeared?")
+                ok = False
+            elif cur[n] != snap[n]:
+                log.warn(f"[WATCH] {s} still growing ({snap[n]}→{cur[n]})")
+                ok = False
+        return ok
+    
+    def wait_five(self, jd, to=300)->bool:
         # Clear cache for new job
         self._found_cache = {}
+        self._scan_mt = None; self._scan_n = 0
         
         log.info(f"[WATCH] Looking in: {jd}")
-        log.info("[WATCH] Waiting for 5 renders...")
-        req = set(REQUIRED_CAM_SUFFIXES)
+        n_req = len(self.suffixes)
+        log.info(f"[WATCH] Waiting for {n_req} renders...")
         
         if not os.path.exists(jd):
             log.error(f"[WATCH] ✗ Directory doesn't exist: {jd}")
             return False
         
-        for attempt in range(300):
-            found = {}
-            try:
-                files = os.listdir(jd)
-                if attempt % 30 == 0:
-                    log.info(f"[WATCH] Found {len(files)} files in folder...")
-                
-                for f in files:
-                    if f.lower().endswith((".jpg", ".jpeg")):
-                        for s in req:
-                            if s in f:
-                                found[s] = os.path.join(jd, f)
-                                if s not in self._found_cache:
-                                    log.info(f"[WATCH] Found {s}: {f}")
-                                    self._found_cache[s] = f
-                                break
-            except Exception as e:
-                log.warn(f"[WATCH] Error listing files: {e}")
-                pass
-            
-            if len(found) >= 5:
-                log.info(f"[WATCH] ✓ Found all 5 renders! Checking stability...")
-                snap = {s: os.path.getsize(p) for s, p in found.items()}
-                log.info(f"[WATCH] Waiting {self.settle}s for stability...")
-                time.sleep(self.settle)
-                
-                ok = True
-                for s, p in found.items():
+        # Arm the watcher before the first listing so nothing slips in between
+        try:
+            dw = _DirWatch(jd)
+        except Exception as e:
+            log.warn(f"[WATCH] Change notifications unavailable ({e}); polling")
+            dw = None
+        
+        found = {}
+        e = time.time() + to
+        rescan = nxt_log = retries = 0
+        delay = self.BACKOFF[0]
+        try:
+            while time.time() < e:
+                now = time.time()
+                if now >= rescan:
+                    had = len(found)
                     try:
-                        ns = os.path.getsize(p)
-                        if ns != snap[s]:
-                            log.warn(f"[WATCH] {s} still growing ({snap[s]}→{ns})")
-                            ok = False
-                    except:
-                        log.warn(f"[WATCH] {s} disappeared?")
-                        ok = False
+                        n = self._scan(jd, found)
+                        if now >= nxt_log:
+                            log.info(f"[WATCH] Found {n} files in folder...")
+                            nxt_log = now + 30
+                    except Exception as ex:
+                        log.warn(f"[WATCH] Error listing files: {ex}")
+                    # Back off while nothing new shows up; snap back on progress
+                    delay = self.BACKOFF[0] if len(found) > had else min(delay * 1.5, self.BACKOFF[1])
+                    rescan = now + (self.RESCAN if dw else delay)
                 
-                if ok:
-                    log.info("[WATCH] ✓ All renders stable!")
-                    return True
-            
-            time.sleep(1)
+                if len(found) >= n_req:
+                    log.info(f"[WATCH] ✓ Found all {n_req} renders! Checking stability...")
+                    try: ok = self._stable(jd, found, dw, e + self.settle)
+                    except OSError as ex:
+                        log.warn(f"[WATCH] Error checking sizes: {ex}"); ok = False
+                    if ok:
+                        log.info("[WATCH] ✓ All renders stable!")
+                        return True
+                    if retries < self.SETTLE_RETRIES:
+                        retries += 1
+                        e += self.settle  # settling doesn't eat into the render budget, up to a point
+                    rescan = 0
+                    continue
+                
+                tmo = min(rescan, e) - time.time()
+                if not dw:
+                    time.sleep(max(0, tmo)); continue
+                ch = dw.wait(tmo)
+                if ch is None:
+                    rescan = 0; continue
+                for act, f in ch:
+                    if act in (2, 4):  # removed / renamed away
+                        for s in [s for s, p in found.items() if os.path.basename(p) == f]:
+                            del found[s]
+                    else:
+                        self._match(jd, f, found)
+        finally:
+            if dw: dw.close()
         
         log.error("[WATCH] ✗ Timeout waiting for renders")
         return False
@@ -403,96 +940,126 @@ class VisualizeDriver:
         self.io = io; self.io.load()
         
     def _has(self, l): return self.io.has(l)
-    def _click(self, l, d=1.0):
+    
+    def _viewport_center(self):
+        h = get_visualize_hwnd()[0]
+        if not h: return None
+        r = win32gui.GetWindowRect(h)  # re-read: the user may move or resize Visualize mid-batch
+        return (r[0] + r[2]) // 2, (r[1] + r[3]) // 2
+    
+    def _click_viewport(self):
+        """Click the centre of the Visualize window so the viewport has input focus."""
+        try:
+            c = self._viewport_center()
+            if not c: return False
+            _hw_click(*c)
+            time.sleep(0.5)
+            return True
+        except Exception:
+            return False
+    
+    def _focus(self, viewport=False):
+        """focus_visualize (a no-op when already foreground), then a viewport click if asked for."""
+        ok = focus_visualize()
+        if viewport: self._click_viewport()
+        return ok
+    
+    def _click(self, l, d=1.0, wait_for=None):
+        """Click a saved point, then sleep d, or with wait_for (title substrings) wait up to d for that dialog."""
         if not self._has(l): raise RuntimeError(f"No {l}")
         x, y = self.io.get(l)
-        mouse.move(x, y, absolute=True, duration=0.1)
-        time.sleep(0.2)
-        mouse.click()
+        _hw_click(x, y)
+        if wait_for: return _wait_for_dialog_title(wait_for, timeout=d, poll=0.05)
         time.sleep(d)
     
     def _dbl(self, l):
         if not self._has(l): raise RuntimeError(f"No {l}")
         x, y = self.io.get(l)
-        mouse.move(x, y, absolute=True, duration=0.1)
-        time.sleep(0.2)
-        mouse.double_click()
+        _hw_click(x, y, n=2)
         time.sleep(0.5)
     
     def open_file(self, p):
         log.info(f"[OPEN] Opening: {os.path.basename(p)}")
         
         # Focus and prepare
-        focus_visualize()
-        time.sleep(0.5)
+        self._focus()
         log.info("[OPEN] Opening file menu (alt+F)...")
-        keyboard.send("alt+f")
+        press("alt+f")
         time.sleep(0.5)
         
         log.info("[OPEN] Opening file dialog (Ctrl+O)...")
-        keyboard.send("ctrl+o")
-        time.sleep(6)  # Your extended wait for dialog
+        press("ctrl+o")
         
         log.info("[OPEN] Waiting for Open dialog...")
-        if _wait_for_dialog_title(timeout=10):
+        odlg = None
+        if _wait_for_dialog_title(timeout=30):
             log.info("[OPEN] Dialog detected")
-            time.sleep(2)
+            odlg = win32gui.GetForegroundWindow()
         else:
             log.warn("[OPEN] Dialog not detected; continuing")
-            time.sleep(5)
-        
-        log.info("[OPEN] Typing filepath...")
-        pyperclip.copy("")
-        time.sleep(0.5)
-        pyperclip.copy(p)
-        time.sleep(0.5)
-        keyboard.send("ctrl+v")
-        time.sleep(5)  # Wait for paste to fully complete
         
-        log.info("[OPEN] Pressing Enter to open...")
-        keyboard.send("enter")
-        time.sleep(10)  # Wait for file to start opening
+        if odlg and wait_dialog_ready(odlg) and set_dialog_path(odlg, p):
+            log.info("[OPEN] Filepath set on dialog; opening")
+        else:
+            log.info("[OPEN] Typing filepath...")
+            if odlg: time.sleep(2)  # Let the filename box take focus
+            _set_clip(p)
+            press("ctrl+v")
+            time.sleep(5)  # Wait for paste to fully complete
+            
+            log.info("[OPEN] Pressing Enter to open...")
+            press("enter")
         
-        # Wait for Import Settings dialog and click OK
+        # Wait for Import Settings dialog and click OK (the old fixed wait is now the ceiling)
         log.info("[OPEN] Waiting for Import Settings dialog to fully appear...")
-        time.sleep(180)  # Keep your long wait
+        # Either the dialog shows up, or the file opens without one (already-imported file)
+        stem = os.path.splitext(os.path.basename(p))[0].lower()
+        def is_import(h): return "Import Settings" in win32gui.GetWindowText(h)
+        def is_loaded(h):
+            t = win32gui.GetWindowText(h)
+            return _is_visualize_title(t) and stem in t.lower()
+        hit = wait_for_window(lambda h: is_import(h) or is_loaded(h), timeout=190)
+        dlg = hit if hit and is_import(hit) else None
+        if hit and not dlg:
+            # The title can update before Import Settings shows; only conclude there is no
+            # dialog once a generous grace has passed
+            log.info("[OPEN] Title updated; checking Import Settings doesn't follow...")
+            dlg = wait_for_window(is_import, timeout=IMPORT_GRACE)
+        skip_ok = bool(hit) and not dlg
+        if dlg:
+            log.info("[OPEN] Import Settings detected")
+            time.sleep(2)  # Let the dialog finish drawing before clicking
+        elif skip_ok:
+            log.info("[OPEN] File opened without Import Settings; skipping OK")
+        else:
+            log.warn("[OPEN] Import Settings not detected; trying saved point anyway")
         
-        if self._has("import_ok_btn"):
+        if skip_ok:
+            pass
+        elif self._has("import_ok_btn"):
             # Preview-move so you can visually verify the saved point is right
             x, y = self.io.get("import_ok_btn")
             log.info(f"[OPEN] Preview OK at ({x},{y})")
-            mouse.move(x, y, absolute=True, duration=0.1)
+            win32api.SetCursorPos((x, y))
             time.sleep(0.6)  # Brief pause so you can see cursor over the button
         
             log.info("[OPEN] Clicking Import Settings OK...")
-            mouse.click()
-            time.sleep(2.5)  # Give the modal time to close
+            _hw_click(x, y)
+            if not dlg:
+                time.sleep(2.5)  # Give the modal time to close
+            elif not wait_for_window_gone(dlg, timeout=10):
+                log.warn("[OPEN] Import Settings still open after OK")
         else:
             log.warn("[OPEN] No import_ok_btn saved; skipping click")
         
-        # Wait for file to load
+        # Wait for file to load. The title shows the file name before the import even
+        # starts, so it's no signal; nothing else in the UI reports the import finishing
         log.info("[OPEN] Waiting for file to load...")
         time.sleep(10)
         
         # Focus viewport and click to ensure it's active
         log.info("[OPEN] Focusing viewport...")
-        focus_visualize()
-        time.sleep(1)
-        
-        # Click in center of window to activate viewport
-        v = get_visualize_hwnd()
-        if v and len(v) == 2 and v[0]:
-            h, t = v
-            try:
-                rect = win32gui.GetWindowRect(h)
-                center_x = (rect[0] + rect[2]) // 2
-                center_y = (rect[1] + rect[3]) // 2
-                mouse.move(center_x, center_y, absolute=True, duration=0.1)
-                time.sleep(0.3)
-                mouse.click()
-                time.sleep(0.5)
-            except:
-                pass
+        self._focus(viewport=True)
         
         log.info("[OPEN] ✓ File loaded and ready")
         return True
@@ -509,19 +1076,7 @@ class VisualizeDriver:
         
         # Focus viewport again after import
         log.info("[CAM] Re-focusing viewport after import...")
-        v = get_visualize_hwnd()
-        if v and len(v) == 2 and v[0]:
-            h, t = v
-            try:
-                rect = win32gui.GetWindowRect(h)
-                center_x = (rect[0] + rect[2]) // 2
-                center_y = (rect[1] + rect[3]) // 2
-                mouse.move(center_x, center_y, absolute=True, duration=0.1)
-                time.sleep(0.2)
-                mouse.click()
-                time.sleep(0.5)
-            except:
-                pass
+        self._click_viewport()
         
         log.info("[CAM] ✓")
 
@@ -531,13 +1086,13 @@ class VisualizeDriver:
         # First camera
         if self._has("old_cam_1"):
             self._click("old_cam_1", d=0.8)
-            keyboard.send("delete")
+            press("delete")
             time.sleep(1)
         
         # Second camera
         if self._has("old_cam_2"):
             self._click("old_cam_2", d=0.8)
-            keyboard.send("delete")
+            press("delete")
             time.sleep(1)
         
         log.info("[CAM] ✓")
@@ -557,9 +1112,7 @@ class VisualizeDriver:
         if self._has("viewport_canvas"):
             log.info("[CAM] Clicking viewport_canvas...")
             x, y = self.io.get("viewport_canvas")
-            mouse.move(x, y, absolute=True, duration=0.1)
-            time.sleep(0.4)
-            mouse.click()
+            _hw_click(x, y)
             time.sleep(0.5)
         
         # Center view
@@ -571,7 +1124,7 @@ class VisualizeDriver:
         log.info(f"[WIZ] Starting render wizard for: {jn}")
         
         # Start render wizard
-        keyboard.send("ctrl+r")
+        press("ctrl+r")
         time.sleep(3)
         
         # Click Next exactly 4 times with small pauses between clicks
@@ -590,50 +1143,55 @@ class VisualizeDriver:
         # Set job name
         log.info("[WIZ] Setting job name...")
         self._click("job_name_textbox", d=1)
-        keyboard.send("ctrl+a")
-        time.sleep(0.5)
-        pyperclip.copy(jn)
-        keyboard.send("ctrl+v")
+        press("ctrl+a")
+        time.sleep(0.1)  # Ctrl is released atomically now; just let the selection land
+        _set_clip(jn)
+        press("ctrl+v")
         time.sleep(1)
         log.info(f"[WIZ] Job name set: {jn}")
         
         # === OUTPUT FOLDER ===
         log.info("[WIZ] Setting output folder...")
-        self._click("output_folder_btn", d=1.5)   # Give dialog time to open
-        
         log.info("[WIZ] Waiting for folder dialog to become foreground...")
-        if not _wait_for_dialog_title(("Browse", "Select", "Folder"), timeout=20):
+        fdlg = None
+        if self._click("output_folder_btn", d=20, wait_for=("Browse", "Select", "Folder")):
+            fdlg = win32gui.GetForegroundWindow()
+        else:
             log.warn("[WIZ] Dialog not detected; adding fallback wait")
             time.sleep(4)
         
-        log.info("[WIZ] Allowing dialog to stabilize...")
-        time.sleep(2.0)
-        
-        # Focus the address bar so paste goes to the right place
-        log.info("[WIZ] Focusing address bar (Alt+D)...")
-        keyboard.send("alt+d")
-        time.sleep(0.4)
-        
-        pyperclip.copy(OUTPUT_ROOT)
-        keyboard.send("ctrl+v")
-        time.sleep(1.5)
-        
-        log.info("[WIZ] Navigating to folder...")
-        keyboard.send("enter")
-        time.sleep(2.5)
-        
-        log.info("[WIZ] Confirming Select Folder via Enter...")
-        keyboard.send("enter")
-        time.sleep(2.0)
+        if fdlg and wait_dialog_ready(fdlg) and set_dialog_path(fdlg, OUTPUT_ROOT):
+            log.info("[WIZ] Folder path set on dialog; confirming")
+        else:
+            log.info("[WIZ] Allowing dialog to stabilize...")
+            time.sleep(2.0)
+            
+            # Focus the address bar so paste goes to the right place
+            log.info("[WIZ] Focusing address bar (Alt+D)...")
+            press("alt+d")
+            time.sleep(0.4)
+            
+            _set_clip(OUTPUT_ROOT)
+            press("ctrl+v")
+            time.sleep(1.5)
+            
+            log.info("[WIZ] Navigating to folder...")
+            press("enter")
+            time.sleep(2.5)
+            
+            log.info("[WIZ] Confirming Select Folder via Enter...")
+            press("enter")
         
-        if _wait_for_dialog_title(("Browse", "Select", "Folder"), timeout=2.0):
+        # Enter usually closes the dialog; only fall back to the saved button if it's still up
+        if fdlg: still_open = not wait_for_window_gone(fdlg, timeout=4.0)
+        else: time.sleep(2.0); still_open = _wait_for_dialog_title(("Browse", "Select", "Folder"), timeout=2.0)
+        if still_open:
             if self._has("folder_select_btn"):
                 x, y = self.io.get("folder_select_btn")
                 log.info(f"[WIZ] Clicking folder_select_btn at ({x}, {y})")
-                mouse.move(x, y, absolute=True, duration=0.1)
-                time.sleep(0.4)
-                mouse.click()
-                time.sleep(2.5)
+                _hw_click(x, y)
+                if not fdlg or not wait_for_window_gone(fdlg, timeout=2.5):
+                    time.sleep(0.5)
         
         log.info("[WIZ] ✓ Output folder set")
 
@@ -646,7 +1204,7 @@ class VisualizeDriver:
         time.sleep(0.4)
         log.info("[WIZ] Closing dropdown...")
         time.sleep(0.4)
-        keyboard.send("esc")
+        press("escape")
         log.info("[WIZ] ✓ All cameras selected")
         time.sleep(8.0)
         
@@ -655,6 +1213,68 @@ class VisualizeDriver:
         self._click("wizard_next_or_render", d=3)
         log.info("[WIZ] ✓ Render started!")
 
+    def _visualize_windows(self):
+        """(visible titled top-level windows of the Visualize process, its pid)."""
+        main = get_visualize_hwnd()[0]
+        if not main: return set(), None
+        pid = win32process.GetWindowThreadProcessId(main)[1]
+        r = set()
+        def cb(h, res):
+            if win32gui.IsWindowVisible(h) and win32gui.GetWindowText(h) \
+                    and win32process.GetWindowThreadProcessId(h)[1] == pid:
+                res.add(h)
+        win32gui.EnumWindows(cb, r)
+        return r, pid
+    
+    def _close_window(self, what, pt):
+        """Alt+F, Ctrl+W, then answer No on the save prompt as soon as it shows up."""
+        self._focus()
+        
+        log.info("[CLOSE] Opening File menu (Alt+F)...")
+        press("alt+f")
+        time.sleep(1.0)  # Wait for menu to open
+        
+        before, pid = self._visualize_windows()
+        log.info(f"[CLOSE] Closing {what} (Ctrl+W)...")
+        press("ctrl+w")
+        
+        # The prompt is whichever new titled Visualize window appears after Ctrl+W
+        prompt = pid and wait_for_window(
+            lambda h: h not in before and win32gui.GetWindowText(h)
+                      and win32process.GetWindowThreadProcessId(h)[1] == pid, timeout=3)
+        if prompt:
+            log.info("[CLOSE] Save prompt up; answering No...")
+            if not _click_dialog_button(prompt, ("No",)): self._dismiss(pt, d=0)
+            if wait_for_window_gone(prompt, timeout=3):
+                log.info(f"[CLOSE] ✓ {what.capitalize()} closed")
+                return
+            log.warn("[CLOSE] Prompt still open; retrying blind")
+        elif pid:
+            log.info(f"[CLOSE] ✓ {what.capitalize()} closed (no save prompt)")
+            return
+        else:
+            time.sleep(2.0)  # couldn't watch for the prompt; give it time to appear
+        
+        # Prompt ignored our answer, or we couldn't watch for one: recorded click / N key
+        self._dismiss(pt, d=2.0)
+    
+    def _try_click(self, pt, d):
+        if not self._has(pt): return False
+        try:
+            log.info(f"[CLOSE] Clicking {pt}...")
+            self._click(pt, d=d)
+            return True
+        except:
+            log.warn("[CLOSE] Button click failed, using keyboard...")
+            return False
+    
+    def _dismiss(self, pt, key="n", d=1.0):
+        """Answer a save prompt: saved point if there is one, else the key."""
+        if self._try_click(pt, d): return
+        log.info(f"[CLOSE] Pressing '{key.upper()}' key...")
+        press(key)
+        time.sleep(min(d, 1.0))
+    
     def close(self):
         """
         Close render window and project using Alt+F menu approach.
@@ -664,36 +1284,7 @@ class VisualizeDriver:
         
         # === STEP 1: Close render window ===
         log.info("[CLOSE] Step 1: Closing render window...")
-        
-        # Ensure Visualize has focus
-        focus_visualize()
-        time.sleep(1.0)
-        
-        # Open File menu with Alt+F
-        log.info("[CLOSE] Opening File menu (Alt+F)...")
-        keyboard.send("alt+f")
-        time.sleep(1.0)  # Wait for menu to open
-        
-        # Close with Ctrl+W
-        log.info("[CLOSE] Closing window (Ctrl+W)...")
-        keyboard.send("ctrl+w")
-        time.sleep(2.0)  # Wait for save dialog to appear
-        
-        # Handle save dialog - click No or press N
-        if self._has("render_no_save_btn"):
-            log.info("[CLOSE] Clicking 'No' button for render window...")
-            try:
-                time.sleep(1.0)
-                self._click("render_no_save_btn", d=2.0)
-                log.info("[CLOSE] ✓ Render window closed via button")
-            except:
-                log.warn("[CLOSE] Button click failed, using keyboard...")
-                keyboard.send("n")
-                time.sleep(1.0)
-        else:
-            log.info("[CLOSE] Pressing 'N' key...")
-            keyboard.send("n")
-            time.sleep(1.0)
+        self._close_window("window", "render_no_save_btn")
         
         # === IMPORTANT: 10 second pause between closes ===
         log.info("[CLOSE] Waiting 10 seconds before closing project...")
@@ -701,61 +1292,73 @@ class VisualizeDriver:
         
         # === STEP 2: Close project file ===
         log.info("[CLOSE] Step 2: Closing project file...")
-        
-        # Ensure Visualize still has focus
-        focus_visualize()
-        time.sleep(1.0)
-        
-        # Open File menu with Alt+F
-        log.info("[CLOSE] Opening File menu (Alt+F)...")
-        keyboard.send("alt+f")
-        time.sleep(1.0)  # Wait for menu to open
-        
-        # Close with Ctrl+W
-        log.info("[CLOSE] Closing project (Ctrl+W)...")
-        keyboard.send("ctrl+w")
-        time.sleep(2.0)  # Wait for save dialog to appear
-        
-        # Handle save dialog - click No or press N
-        if self._has("project_no_save_btn"):
-            log.info("[CLOSE] Clicking 'No' button for project...")
-            try:
-                time.sleep(1.0)
-                self._click("project_no_save_btn", d=2.0)
-                log.info("[CLOSE] ✓ Project closed via button")
-            except:
-                log.warn("[CLOSE] Button click failed, using keyboard...")
-                keyboard.send("n")
-                time.sleep(1.0)
-        else:
-            log.info("[CLOSE] Pressing 'N' key...")
-            keyboard.send("n")
-            time.sleep(1.0)
+        self._close_window("project", "project_no_save_btn")
         
         # === Final cleanup ===
         log.info("[CLOSE] Final cleanup...")
         time.sleep(2.0)
-        keyboard.send("escape")  # Clear any lingering dialogs
+        press("escape")  # Clear any lingering dialogs
         time.sleep(0.5)
+        _hwnd_cache[0] = None  # project closed; re-resolve the main window next job
         
         log.info("[CLOSE] ✓ Close sequence complete")
 
-def read_excel(ep):
+def _calamine_rows(sh):
+    """Rows anchored at A1 like openpyxl's; calamine's own range starts at the first used cell."""
+    if not hasattr(sh, "iter_rows"):  # older python-calamine: whole sheet, but keep the empty area
+        yield from sh.to_python(skip_empty_area=False)
+        return
+    r0, c0 = getattr(sh, "start", None) or (0, 0)
+    blank = (None,) * (c0 + getattr(sh, "width", 0))  # full-width empty rows, as openpyxl gives them
+    for i in range(r0): yield blank
+    pad = (None,) * c0
+    for r in sh.iter_rows(): yield pad + tuple(r)  # row by row, columns still line up with 0/9/10
+
+def _open_workbook(ep):
+    """(row iterator, close) for the first sheet: calamine if installed, else streaming openpyxl."""
     for i in range(5):
-        try: df=pd.read_excel(ep, engine="openpyxl"); break
-        except PermissionError: time.sleep(1.5)
-    else: raise
-    
-    if "A" not in df.columns and len(df.columns) >= 11:
-        df.rename(columns={df.columns[0]:"A", df.columns[9]:"J", df.columns[10]:"K"}, inplace=True)
-    
-    for c in ("A","J","K"):
-        if c not in df.columns: raise RuntimeError(f"Missing {c}")
-    
-    for idx,row in df.iterrows():
-        yield {"A": row.get("A",""), "J": row.get("J",""), "K": row.get("K",""), "_index": idx}
+        try:
+            cw = _calamine()
+            if cw:
+                wb = cw.from_path(ep)
+                return _calamine_rows(wb.get_sheet_by_index(0)), getattr(wb, "close", lambda: None)
+            from openpyxl import load_workbook  # only the Excel path needs it
+            wb = load_workbook(ep, read_only=True, data_only=True)
+            return wb.active.iter_rows(values_only=True), wb.close
+        except PermissionError as e: err = e; time.sleep(1.5)  # Excel still has it locked
+    raise err
 
-def process(d, w, r, jdt, pdm):
+def _cell(v):
+    if v is None: return ""
+    # calamine hands back every number as float; match openpyxl so 19136261 doesn't become "19136261.0"
+    if isinstance(v, float) and v.is_integer(): return int(v)
+    return v
+
+def read_excel(ep):
+    """Yield A/J/K from the first sheet, one row at a time."""
+    rows, close = _open_workbook(ep)
+    try:
+        hdr = ["" if h is None else str(h) for h in next(rows, ())]
+        
+        if "A" not in hdr and len(hdr) >= 11:
+            cols = {"A": 0, "J": 9, "K": 10}
+        else:
+            cols = {}
+            for c in ("A","J","K"):
+                if c not in hdr: raise RuntimeError(f"Missing {c}")
+                cols[c] = hdr.index(c)
+        pick = operator.itemgetter(cols["A"], cols["J"], cols["K"])  # resolved once from the header
+        n = max(cols.values()) + 1
+        
+        for idx, row in enumerate(rows):
+            if all(v is None or v == "" for v in row): continue  # blank/formatted-only rows
+            if len(row) < n: row = tuple(row) + (None,) * (n - len(row))
+            a, j, k = pick(row)
+            yield {"A": _cell(a), "J": _cell(j), "K": _cell(k), "_index": idx}
+    finally:
+        close()
+
+def process(d, w, r, jdt, pdm, nxt=None):
     pt=str(r["A"]).strip()
     tms=str(r["K"]).strip()
     orig=str(r["J"]).strip()
@@ -786,6 +1389,9 @@ def process(d, w, r, jdt, pdm):
     d.del_old_cams()
     d.center_cams()
     d.render(jn)
+    # Render is running: fetch the next row's file now, while Visualize is busy on the GPU
+    # rather than loading this one from disk
+    if pdm and nxt: pdm.prefetch(str(nxt["J"]).strip())
     
     jdir = w.wait_dir(jn, jdt)
     if not jdir:
@@ -849,7 +1455,7 @@ EXAMPLES:
         sys.exit(2)
     
     pdm=None
-    if a.pdm_vault and HAVE_COM:
+    if a.pdm_vault and have_com():
         try:
             pdm=PDMClient(a.pdm_vault)
             pdm.login()
@@ -863,16 +1469,21 @@ EXAMPLES:
     log.info("STARTING AUTOMATION")
     log.info("="*80)
     
-    for row in read_excel(a.excel):
-        try:
-            process(d, w, row, a.jobdir_timeout, pdm)
-        except KeyboardInterrupt:
-            log.error("STOPPED BY USER (Ctrl+C)")
-            break
-        except Exception as e:
-            log.error(f"ERROR on row {row.get('_index')}: {e}")
-            import traceback
-            traceback.print_exc()
+    rows = read_excel(a.excel)
+    nxt = next(rows, None)
+    try:
+        while nxt is not None:
+            row, nxt = nxt, next(rows, None)  # one row of lookahead for the PDM prefetch
+            try:
+                process(d, w, row, a.jobdir_timeout, pdm, nxt)
+            except KeyboardInterrupt:
+                log.error("STOPPED BY USER (Ctrl+C)")
+                break
+            except Exception as e:
+                log.error(f"ERROR on row {row.get('_index')}: {e}")
+                log.error(traceback.format_exc().rstrip())
+    finally:
+        if pdm: pdm.close()
     
     log.info("="*80)
     log.info("AUTOMATION COMPLETE")